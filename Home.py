@@ -1,18 +1,12 @@
 import streamlit as st
-import logging
 import importlib
 from pages import Video_Summarizer, Food_Analyzer, Code_Helper, Chat_Assistant
 from dotenv import load_dotenv
 import os
+from core.logging_config import get_logger
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='app.log',  # Log to a file
-    filemode='a'  # Append mode
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
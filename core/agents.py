@@ -0,0 +1,317 @@
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+from core.context_cache import CONTEXT_CACHE_MIN_CHARS, fingerprint, fingerprint_file, get_context_cache
+from core.logging_config import get_logger
+from core.model_router import STREAM_TIMEOUT, get_model_router
+from core.single_flight import get_single_flight
+
+logger = get_logger(__name__)
+
+# Context caching needs an explicitly versioned model; other requests are routed
+CACHE_MODEL = "models/gemini-1.5-flash-002"
+CACHE_TIMEOUT = 90  # seconds; requests on a cached context bypass the router
+
+FOOD_MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+FOOD_MIME_TYPES = ['image/jpeg', 'image/png']
+VIDEO_MAX_FILE_SIZE = 200 * 1024 * 1024  # 200 MB
+VIDEO_EXTENSIONS = ['mp4', 'mov', 'avi']
+MAX_QUERY_LENGTH = 1000
+VIDEO_UPLOAD_TTL = 60 * 60  # seconds an uploaded video is kept for follow-up questions
+MAX_VIDEO_UPLOADS = 16  # older uploads are deleted from Gemini beyond this
+
+FOOD_PROMPT = """
+        You are an expert nutritionist and food analyst. Carefully examine the food image and provide:
+        1. Detailed list of food items identified
+        2. Calories for each item
+        3. Nutritional breakdown (protein, carbs, fats)
+        4. Estimated total calorie count
+        5. Brief health insights or recommendations
+
+        Format your response clearly with headings and bullet points.
+        """
+
+TASK_PROMPTS = {
+    "Explain the Code": "Explain this code in detail, including its purpose, functionality, and key concepts:",
+    "Debug the Code": "Analyze this code for potential issues and provide debugging suggestions:",
+    "Optimize the Code": "Suggest optimizations for this code, explaining the improvements:"
+}
+
+VIDEO_INSTRUCTIONS = """
+            Analyze the uploaded video for content and context, answering the user's query.
+
+            Provide a detailed response with:
+            1. Main points and key moments
+            2. Relevant timestamps
+            3. Context and insights
+            4. Summary and recommendations
+            """
+
+
+def configure_gemini(api_key=None):
+    """Configure the Gemini client, defaulting to GEMINI_API_KEY."""
+    load_dotenv()
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+    genai.configure(api_key=api_key)
+
+
+# Food analysis
+
+def analyze_food(image_part, prompt=FOOD_PROMPT):
+    """Analyze a food image and return the response text.
+
+    `image_part` is a `{"mime_type": ..., "data": ...}` dict. Concurrent
+    requests for the same image and prompt share one API call.
+    """
+    def generate(model_name, timeout):
+        model = genai.GenerativeModel(model_name=model_name)
+        response = model.generate_content([image_part, prompt], request_options={"timeout": timeout})
+        return response.text
+
+    key = fingerprint("food", prompt, image_part["data"])
+    return get_single_flight().do(key, lambda: get_model_router().call("food", len(prompt), generate))
+
+
+# Chat
+
+def start_chat(model_name, history=()):
+    """Start a Gemini chat session seeded with `(role, content)` history."""
+    model = genai.GenerativeModel(model_name=model_name)
+    return model.start_chat(history=[
+        {"role": "user" if role == "user" else "model", "parts": [content]}
+        for role, content in history
+    ])
+
+
+def chat_response(query, history=()):
+    """Return a streaming response to `query` given earlier history."""
+    input_size = len(query) + sum(len(content) for _, content in history)
+    return get_model_router().call(
+        "chat",
+        input_size,
+        lambda model_name, timeout: start_chat(model_name, history).send_message(
+            query, stream=True, request_options={"timeout": timeout}
+        ),
+        stream=True,
+    )
+
+
+# Code help
+
+def create_analysis_prompt(task, code):
+    """Create a prompt for the Gemini API based on the task."""
+    return f"{TASK_PROMPTS[task]}\n\n{code}"
+
+
+def _cached_code_response(task, code):
+    """Answer from a cached context holding the code; only for very large snippets."""
+    if len(code) < CONTEXT_CACHE_MIN_CHARS:
+        return None
+    key = f"code:{fingerprint(code)}"
+    cached_model = get_context_cache().model_for(
+        key,
+        CACHE_MODEL,
+        [code],
+        system_instruction="You are an expert software engineer. Answer requests about the code provided in the context."
+    )
+    if cached_model is None:
+        return None
+    try:
+        return cached_model.generate_content(
+            TASK_PROMPTS[task].rstrip(":") + ".", stream=True, request_options={"timeout": STREAM_TIMEOUT}
+        )
+    except Exception as e:
+        logger.error(f"Error fetching cached response from Gemini API: {e}")
+        get_context_cache().invalidate(key)
+        return None
+
+
+def _request_code_analysis(task, code):
+    response_stream = _cached_code_response(task, code)
+    if response_stream is None:
+        prompt = create_analysis_prompt(task, code)
+        response_stream = get_model_router().call(
+            task,
+            len(prompt),
+            lambda model_name, timeout: genai.GenerativeModel(model_name=model_name).generate_content(
+                prompt, stream=True, request_options={"timeout": timeout}
+            ),
+            stream=True,
+        )
+    return response_stream
+
+
+def analyze_code(task, code):
+    """Return a streaming response for a code task.
+
+    Identical task/snippet requests in flight share one streamed response.
+    """
+    if task not in TASK_PROMPTS:
+        raise ValueError(f"Invalid task. Allowed: {', '.join(TASK_PROMPTS)}")
+    return get_single_flight().stream(
+        fingerprint("code", task, code),
+        lambda: _request_code_analysis(task, code)
+    )
+
+
+# Video summarization
+
+@lru_cache(maxsize=None)
+def _timed_gemini():
+    """Return phi's Gemini model extended with a client timeout."""
+    from phi.model.google import Gemini
+
+    class TimedGemini(Gemini):
+        # phi does not pass request options to Gemini, so each model call
+        # would otherwise wait indefinitely
+        timeout: Optional[float] = None
+
+        def invoke(self, messages):
+            return self.get_client().generate_content(
+                contents=self.format_messages(messages),
+                request_options={"timeout": self.timeout},
+            )
+
+    return TimedGemini
+
+
+def create_video_agent(model_name, timeout):
+    """Return a phi agent for when the video context cannot be cached.
+
+    Agents keep per-run state, so each request gets its own. `timeout`
+    applies to every Gemini call the agent makes.
+    """
+    from phi.agent import Agent
+    from phi.tools.duckduckgo import DuckDuckGo
+
+    return Agent(
+        name="Video AI Summarizer",
+        model=_timed_gemini()(id=model_name, timeout=timeout),
+        tools=[DuckDuckGo()],
+        markdown=True,
+    )
+
+
+def upload_video(video_path):
+    """Upload a video file to Gemini and wait until it is processed."""
+    processed_video = genai.upload_file(video_path)
+    while processed_video.state.name == "PROCESSING":
+        time.sleep(1)
+        processed_video = genai.get_file(processed_video.name)
+    return processed_video
+
+
+def upload_video_bytes(data, extension):
+    """Upload video bytes through a temporary file and wait until processed."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{extension}") as temp_video:
+        temp_video.write(data)
+        video_path = temp_video.name
+    try:
+        return upload_video(video_path)
+    finally:
+        Path(video_path).unlink(missing_ok=True)
+
+
+_video_uploads = OrderedDict()  # video fingerprint -> (File, expires_at)
+_video_uploads_lock = threading.Lock()
+
+
+def _delete_uploads(files):
+    for video_file in files:
+        try:
+            genai.delete_file(video_file.name)
+        except Exception as e:
+            logger.warning(f"Failed to delete uploaded video: {e}", extra={"file": video_file.name})
+
+
+def get_video_upload(video_key, upload):
+    """Return the uploaded file for a video, calling `upload()` on first use.
+
+    Uploads are keyed by the video's fingerprint so repeated questions do
+    not upload it again. Expired uploads, and the oldest ones beyond
+    MAX_VIDEO_UPLOADS, are deleted from Gemini.
+    """
+    now = time.time()
+    with _video_uploads_lock:
+        stale = [key for key, (_, expires_at) in _video_uploads.items() if expires_at <= now]
+        expired = [_video_uploads.pop(key)[0] for key in stale]
+        entry = _video_uploads.get(video_key)
+        if entry is not None:
+            _video_uploads[video_key] = (entry[0], now + VIDEO_UPLOAD_TTL)
+            _video_uploads.move_to_end(video_key)
+    _delete_uploads(expired)
+    if entry is not None:
+        return entry[0]
+
+    video_file = get_single_flight().do(f"video-upload:{video_key}", upload)
+    with _video_uploads_lock:
+        entry = _video_uploads.get(video_key)
+        if entry is not None and entry[0].name != video_file.name:
+            # A caller that missed the in-flight upload made its own; keep one
+            unused = [video_file]
+            video_file = entry[0]
+        else:
+            unused = []
+            _video_uploads[video_key] = (video_file, time.time() + VIDEO_UPLOAD_TTL)
+            _video_uploads.move_to_end(video_key)
+        while len(_video_uploads) > MAX_VIDEO_UPLOADS:
+            unused.append(_video_uploads.popitem(last=False)[1][0])
+    _delete_uploads(unused)
+    return video_file
+
+
+def summarize_video(processed_video, query, video_key):
+    """Answer `query` about an uploaded video and return the response text.
+
+    `video_key` fingerprints the video so follow-up questions reuse its
+    cached context instead of re-tokenizing it.
+    """
+    key = f"video:{video_key}"
+    cached_model = get_context_cache().model_for(
+        key,
+        CACHE_MODEL,
+        [processed_video],
+        system_instruction=VIDEO_INSTRUCTIONS,
+    )
+    if cached_model is not None:
+        try:
+            return cached_model.generate_content(
+                f"Query: {query}", request_options={"timeout": CACHE_TIMEOUT}
+            ).text
+        except Exception as e:
+            # The handle may have expired on the server; answer without it
+            logger.error(f"Error fetching cached response from Gemini API: {e}")
+            get_context_cache().invalidate(key)
+
+    analysis_prompt = f"{VIDEO_INSTRUCTIONS}\nQuery: {query}"
+
+    def run_agent(model_name, timeout):
+        agent = create_video_agent(model_name, timeout)
+        return agent.run(analysis_prompt, videos=[processed_video]).content
+
+    return get_model_router().call("video", len(analysis_prompt), run_agent)
+
+
+def summarize_video_file(video_path, query):
+    """Answer `query` about a local video file, uploading it if needed."""
+    video_key = fingerprint_file(video_path)
+    processed_video = get_video_upload(video_key, lambda: upload_video(video_path))
+    return summarize_video(processed_video, query, video_key)
+
+
+def summarize_video_bytes(data, extension, query):
+    """Answer `query` about an in-memory video, uploading it if needed."""
+    video_key = fingerprint(data)
+    processed_video = get_video_upload(video_key, lambda: upload_video_bytes(data, extension))
+    return summarize_video(processed_video, query, video_key)
@@ -0,0 +1,69 @@
+import os
+import uuid
+from collections import deque
+from itertools import islice
+
+import streamlit as st
+
+from core.history_store import get_history_store
+
+# Query parameter that keeps the conversation id across reconnects and restarts
+CONVERSATION_PARAM = "cid"
+# Opt-in: the id in the URL is the only key to a stored conversation, so
+# anyone with the page link can read and continue it
+HISTORY_URL_RESTORE = os.getenv("CHAT_HISTORY_URL_RESTORE", "").lower() in ("1", "true", "yes")
+
+
+class ChatHistory:
+    """Conversation history for one page, persisted when a store is configured.
+
+    Messages are `(id, role, content)` tuples. Without a HistoryStore they
+    live in a bounded deque in the session state, so trimming never copies
+    the list. The conversation id is private to the session unless URL
+    restore is enabled, in which case it is kept in the page URL.
+    """
+
+    def __init__(self, key, max_length):
+        self.key = key
+        self.max_length = max_length
+        self.store = get_history_store()
+        self.restore_from_url = self.store is not None and HISTORY_URL_RESTORE
+        if self.store is None and key not in st.session_state:
+            st.session_state[key] = deque(maxlen=max_length)
+            st.session_state[f"{key}_next_id"] = 0
+        self.conversation_id = f"{key}:{self._get_conversation_id()}"
+
+    def _get_conversation_id(self):
+        """Return the conversation id, restoring it from the URL if enabled."""
+        state_key = f"{self.key}_conversation_id"
+        if state_key not in st.session_state:
+            cid = st.query_params.get(CONVERSATION_PARAM) if self.restore_from_url else None
+            st.session_state[state_key] = cid or uuid.uuid4().hex
+        if self.restore_from_url:
+            st.query_params[CONVERSATION_PARAM] = st.session_state[state_key]
+        return st.session_state[state_key]
+
+    def append(self, role, content):
+        """Add a message and return its id."""
+        if self.store is not None:
+            return self.store.append(self.conversation_id, role, content)
+        message_id = st.session_state[f"{self.key}_next_id"]
+        st.session_state[f"{self.key}_next_id"] = message_id + 1
+        st.session_state[self.key].append((message_id, role, content))
+        return message_id
+
+    def page(self, limit, before_id=None):
+        """Return up to `limit` messages older than `before_id`, oldest first."""
+        if self.store is not None:
+            return self.store.fetch_page(self.conversation_id, limit, before_id)
+        messages = st.session_state[self.key]
+        newer_first = (m for m in reversed(messages) if before_id is None or m[0] < before_id)
+        page = list(islice(newer_first, limit))
+        page.reverse()
+        return page
+
+    def count(self):
+        """Return the number of messages in the conversation."""
+        if self.store is not None:
+            return self.store.count(self.conversation_id)
+        return len(st.session_state[self.key])
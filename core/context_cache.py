@@ -0,0 +1,147 @@
+import hashlib
+import os
+import threading
+import time
+from datetime import timedelta
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from google.generativeai import caching
+
+from core.logging_config import get_logger
+from core.single_flight import get_single_flight
+
+logger = get_logger(__name__)
+
+# Lifetime of a cached context on the Gemini side
+CONTEXT_CACHE_TTL = timedelta(minutes=int(os.getenv("CONTEXT_CACHE_TTL_MINUTES", 30)))
+# Gemini rejects caches below a minimum token count; roughly 4 characters per token
+CONTEXT_CACHE_MIN_CHARS = 4 * 32768
+
+# Create errors that will not go away on retry (content too small, unsupported model)
+PERMANENT_CACHE_ERRORS = (
+    google_exceptions.InvalidArgument,
+    google_exceptions.NotFound,
+    google_exceptions.FailedPrecondition,
+)
+
+
+def fingerprint(*parts):
+    """Return a stable hash for strings or bytes, used as cache key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def fingerprint_file(path, chunk_size=1024 * 1024):
+    """Return `fingerprint()` of a file's bytes without reading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ContextCacheManager:
+    """Track Gemini `CachedContent` handles and reuse them across requests.
+
+    Handles are keyed by a caller-supplied fingerprint of the shared prefix
+    (e.g. a video or a long code file). Expiry is tracked locally and the
+    TTL is extended when a handle past half its life is reused. Concurrent
+    first requests for one key share a single create call. Contexts that
+    cannot be cached (too small, unsupported model) are remembered so the
+    API is not asked again; transient failures are retried next time.
+    """
+
+    def __init__(self, ttl=CONTEXT_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}  # key -> (CachedContent or None, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key, model, contents, system_instruction=None):
+        """Return the cached context for `key`, creating it on first use.
+
+        Returns None when the context cannot be cached; callers should then
+        send the full prompt as usual.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            cached, expires_at = entry
+            if cached is not None and expires_at - time.time() < self.ttl.total_seconds() / 2:
+                cached = self._extend(key, cached)
+            return cached
+
+        return get_single_flight().do(
+            f"context-cache:{key}",
+            lambda: self._create(key, model, contents, system_instruction),
+        )
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.time():
+            return entry
+        return None
+
+    def _create(self, key, model, contents, system_instruction):
+        # Another caller may have finished creating it since our lookup
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+
+        try:
+            cached = caching.CachedContent.create(
+                model=model,
+                display_name=key[:64],
+                system_instruction=system_instruction,
+                contents=contents,
+                ttl=self.ttl,
+            )
+            logger.info("Created context cache", extra={"cache_key": key, "model": model})
+        except PERMANENT_CACHE_ERRORS as e:
+            logger.warning(f"Context caching unavailable, sending full prompt: {e}", extra={"cache_key": key})
+            cached = None
+        except Exception as e:
+            logger.warning(f"Context cache creation failed, sending full prompt: {e}", extra={"cache_key": key})
+            return None
+        with self._lock:
+            self._entries[key] = (cached, time.time() + self.ttl.total_seconds())
+        return cached
+
+    def _extend(self, key, cached):
+        try:
+            cached.update(ttl=self.ttl)
+        except Exception as e:
+            logger.warning(f"Failed to extend context cache: {e}", extra={"cache_key": key})
+            return cached
+        with self._lock:
+            self._entries[key] = (cached, time.time() + self.ttl.total_seconds())
+        return cached
+
+    def invalidate(self, key):
+        """Forget the handle for `key`, e.g. after a request using it failed."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def model_for(self, key, model, contents, system_instruction=None):
+        """Return a GenerativeModel bound to the cached context, or None."""
+        cached = self.get(key, model, contents, system_instruction)
+        if cached is None:
+            return None
+        return genai.GenerativeModel.from_cached_content(cached_content=cached)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_context_cache():
+    """Return the process-wide ContextCacheManager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ContextCacheManager()
+        return _manager
@@ -0,0 +1,97 @@
+import os
+import sqlite3
+import threading
+import time
+
+# Path of the SQLite database; persistence is disabled when unset
+HISTORY_DB_PATH = os.getenv("CHAT_HISTORY_DB")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+-- ids grow with insertion time, so (conversation_id, id) serves time-ordered paging
+CREATE INDEX IF NOT EXISTS idx_messages_conversation
+    ON messages (conversation_id, id);
+"""
+
+
+class HistoryStore:
+    """SQLite-backed message store, shared by all sessions of the process.
+
+    Each thread gets its own connection; the database runs in WAL mode so
+    readers never block the writer.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, conversation_id, role, content):
+        """Store a message and return its id."""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO messages (conversation_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                (conversation_id, role, content, time.time()),
+            )
+            return cursor.lastrowid
+
+    def fetch_page(self, conversation_id, limit, before_id=None):
+        """Return up to `limit` messages older than `before_id`, oldest first.
+
+        Rows are `(id, role, content)` tuples. Without `before_id` the most
+        recent page is returned.
+        """
+        query = "SELECT id, role, content FROM messages WHERE conversation_id = ?"
+        params = [conversation_id]
+        if before_id is not None:
+            query += " AND id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        rows = self._connection().execute(query, params).fetchall()
+        rows.reverse()
+        return rows
+
+    def count(self, conversation_id):
+        """Return the number of stored messages in a conversation."""
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM messages WHERE conversation_id = ?",
+            (conversation_id,),
+        ).fetchone()
+        return row[0]
+
+    def clear(self, conversation_id):
+        """Delete all messages of a conversation."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Return the process-wide HistoryStore, or None if persistence is off."""
+    global _store
+    if not HISTORY_DB_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore(HISTORY_DB_PATH)
+        return _store
@@ -0,0 +1,42 @@
+import streamlit as st
+
+
+def format_message(label, content, code_block=False):
+    """Build the markdown for one message."""
+    if code_block:
+        return f"**{label}:** ```python\n{content}\n```"
+    return f"**{label}:** {content}"
+
+
+def _load_more(visible_key, page_size):
+    st.session_state[visible_key] += page_size
+
+
+@st.fragment
+def render_history(history, page_size, bot_label, code_block=False):
+    """Render the most recent messages of a ChatHistory.
+
+    Only the visible window is fetched and rendered; older messages are
+    loaded a page at a time. Running as a fragment, "load more" reruns only
+    this block instead of the whole page. Nothing is cached: every full
+    rerun (a new chat message, a widget change) still rebuilds the visible
+    window, so rerun cost is bounded by the page size, not by history length.
+    """
+    visible_key = f"{history.key}_visible"
+    if visible_key not in st.session_state:
+        st.session_state[visible_key] = page_size
+
+    hidden = history.count() - st.session_state[visible_key]
+    if hidden > 0:
+        st.button(
+            f"Load older messages ({hidden} more)",
+            key=f"{history.key}_load_more",
+            on_click=_load_more,
+            args=(visible_key, page_size),
+        )
+
+    for _, role, content in history.page(st.session_state[visible_key]):
+        label = "You" if role == "user" else bot_label
+        st.chat_message("user" if role == "user" else "assistant").markdown(
+            format_message(label, content, code_block)
+        )
@@ -0,0 +1,103 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+# Log file settings (overridable through environment variables)
+LOG_FILE = os.getenv("APP_LOG_FILE", "app.log")
+LOG_LEVEL = os.getenv("APP_LOG_LEVEL", "INFO")
+LOG_MAX_BYTES = int(os.getenv("APP_LOG_MAX_BYTES", 5 * 1024 * 1024))  # 5 MB per file
+LOG_BACKUP_COUNT = int(os.getenv("APP_LOG_BACKUP_COUNT", 5))
+
+# Attributes present on every LogRecord; anything else was passed via `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_lock = threading.Lock()
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as single-line JSON objects."""
+
+    def format(self, record):
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        # Include structured fields passed through `extra=`
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback separate from the message.
+
+    The stock `prepare` folds the traceback into `msg` and drops `exc_info`;
+    here it is rendered into `exc_text` so JsonFormatter can write it as
+    its own field.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def setup_logging():
+    """Configure process-wide logging once.
+
+    Log calls only enqueue the record; a background QueueListener thread
+    writes it to a size-rotated JSON log file. Safe to call on every
+    Streamlit rerun and from every page.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(JsonFormatter())
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        root.setLevel(LOG_LEVEL)
+        # Drop handlers installed by earlier basicConfig calls
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_QueueHandler(log_queue))
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def get_logger(name):
+    """Return a logger after making sure logging has been configured."""
+    setup_logging()
+    return logging.getLogger(name)
@@ -0,0 +1,217 @@
+import itertools
+import os
+import threading
+import time
+
+from google.api_core import exceptions as google_exceptions
+
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Candidate models, cheapest and fastest first
+ROUTER_MODELS = os.getenv(
+    "ROUTER_MODELS",
+    "gemini-1.5-flash-8b,gemini-1.5-flash,gemini-2.0-flash-exp,gemini-1.5-pro",
+).split(",")
+
+# Lowest tier (index into ROUTER_MODELS) each task is routed to
+TASK_MIN_TIER = {
+    "food": 0,
+    "chat": 0,
+    "Explain the Code": 0,
+    "Debug the Code": 1,
+    "Optimize the Code": 1,
+    "video": 2,
+}
+
+SHORT_INPUT_CHARS = 200  # short requests go to the fastest model of their tier range
+LARGE_INPUT_CHARS = 8000  # large requests are moved up one tier
+FAST_CANDIDATES = 2  # models compared by latency for short requests
+
+EWMA_ALPHA = 0.2
+MAX_ERROR_RATE = 0.5  # models above this smoothed error rate are tried last
+ERROR_HALF_LIFE = 60  # seconds for a model's error rate to halve without new failures
+QUOTA_COOLDOWN = 60  # seconds a model is skipped after a quota error
+
+# Client timeout per tier (index into ROUTER_MODELS); heavier models get longer.
+# For streams it bounds the wait for the first chunk only
+TIER_TIMEOUTS = (30, 45, 90, 180)
+# Deadline for a whole streamed response, so long answers are not cut off
+STREAM_TIMEOUT = 900
+
+# Errors that make the router retry the request on the next model
+FAILOVER_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.ServiceUnavailable,
+    TimeoutError,
+)
+
+
+class _ModelStats:
+    def __init__(self):
+        # Smoothed seconds to the full response, and to the first chunk of a
+        # stream; the two are never compared with each other
+        self.latency = {False: None, True: None}
+        self.error_rate = 0.0
+        self.updated_at = time.time()
+        self.cooldown_until = 0.0
+
+    def decay(self, now):
+        """Let the error rate wear off so demoted models come back."""
+        self.error_rate *= 0.5 ** ((now - self.updated_at) / ERROR_HALF_LIFE)
+        self.updated_at = now
+
+
+class ModelRouter:
+    """Pick a Gemini model per request and fail over on quota errors or timeouts.
+
+    The starting tier comes from the task and input size. Observed latency
+    of the same kind (streamed or not) orders the fast candidates for
+    short requests once all of them have been measured; models with a high
+    error rate or a recent quota error are moved to the back. Only
+    failover errors (quota, timeout, unavailable) count against a model,
+    and the penalty decays over time.
+    """
+
+    def __init__(self, models=ROUTER_MODELS):
+        self.models = list(models)
+        self._stats = {model: _ModelStats() for model in self.models}
+        self._lock = threading.Lock()
+
+    def choose(self, task, input_size, stream=False):
+        """Return the models to try for a request, in order."""
+        start = TASK_MIN_TIER.get(task, 0)
+        if input_size >= LARGE_INPUT_CHARS:
+            start += 1
+        start = min(start, len(self.models) - 1)
+        eligible = self.models[start:]
+
+        with self._lock:
+            fast = eligible[:FAST_CANDIDATES]
+            latencies = [self._stats[m].latency[stream] for m in fast]
+            if input_size <= SHORT_INPUT_CHARS and None not in latencies:
+                # Until every candidate has been measured, keep the cost order
+                fast = [m for _, m in sorted(zip(latencies, fast), key=lambda pair: pair[0])]
+                eligible = fast + eligible[FAST_CANDIDATES:]
+            now = time.time()
+            for m in eligible:
+                self._stats[m].decay(now)
+            healthy = [
+                m for m in eligible
+                if self._stats[m].cooldown_until <= now and self._stats[m].error_rate <= MAX_ERROR_RATE
+            ]
+        degraded = [m for m in eligible if m not in healthy]
+        # Cheaper models are a last resort when every eligible model fails
+        return healthy + degraded + self.models[:start][::-1]
+
+    def timeout_for(self, model):
+        """Return the client timeout in seconds for a model's tier."""
+        tier = self.models.index(model) if model in self.models else len(TIER_TIMEOUTS) - 1
+        return TIER_TIMEOUTS[min(tier, len(TIER_TIMEOUTS) - 1)]
+
+    def record(self, model, latency=None, error=None, stream=False):
+        """Update a model's smoothed latency and error rate.
+
+        `latency` is time to the first chunk when `stream` is set, else time
+        to the full response. `error` should be one of FAILOVER_ERRORS;
+        request errors such as a bad image say nothing about the model and
+        are not recorded.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(model, _ModelStats())
+            stats.decay(time.time())
+            stats.error_rate += EWMA_ALPHA * ((1.0 if error else 0.0) - stats.error_rate)
+            if latency is not None:
+                previous = stats.latency[stream]
+                stats.latency[stream] = latency if previous is None else (
+                    previous + EWMA_ALPHA * (latency - previous)
+                )
+            if isinstance(error, google_exceptions.ResourceExhausted):
+                stats.cooldown_until = time.time() + QUOTA_COOLDOWN
+
+    def call(self, task, input_size, fn, stream=False):
+        """Run `fn(model_name, timeout)` on the routed model, failing over as needed.
+
+        `fn` must apply `timeout` (seconds) to its Gemini call, e.g. through
+        `request_options={"timeout": timeout}`, so a hung request fails over.
+
+        With `stream=True`, `fn` returns a response stream and gets
+        STREAM_TIMEOUT for the whole response. Its first chunk is fetched
+        here within the tier timeout, so errors and stalls surface before
+        the caller starts reading.
+        """
+        candidates = self.choose(task, input_size, stream)
+        last_error = None
+        logger.info(
+            "Routing request",
+            extra={"task": task, "input_size": input_size, "model": candidates[0], "candidates": candidates},
+        )
+        for attempt, model in enumerate(candidates):
+            started = time.time()
+            try:
+                if stream:
+                    result = self._start_stream(fn, model)
+                else:
+                    result = fn(model, self.timeout_for(model))
+            except FAILOVER_ERRORS as e:
+                last_error = e
+                self.record(model, error=e)
+                logger.warning(
+                    f"Model failed, trying next candidate: {e}",
+                    extra={"task": task, "model": model, "attempt": attempt + 1},
+                )
+                continue
+            latency = time.time() - started
+            self.record(model, latency=latency, stream=stream)
+            logger.info(
+                "Routed request completed",
+                extra={"task": task, "model": model, "attempt": attempt + 1, "latency": round(latency, 3)},
+            )
+            return result
+        raise RuntimeError(f"All models failed for task '{task}': {', '.join(candidates)}") from last_error
+
+    def _start_stream(self, fn, model):
+        """Open a stream and wait up to the tier timeout for its first chunk.
+
+        The wait runs on its own thread so a stalled stream can be given up
+        on; the abandoned stream is dropped once its first chunk arrives or
+        STREAM_TIMEOUT expires.
+        """
+        outcome = {}
+        ready = threading.Event()
+
+        def fetch():
+            try:
+                result = fn(model, STREAM_TIMEOUT)
+                if result is not None:
+                    result = iter(result)
+                    first = next(result, None)
+                    result = itertools.chain([] if first is None else [first], result)
+                outcome["result"] = result
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                ready.set()
+
+        threading.Thread(target=fetch, daemon=True, name=f"first-chunk-{model}").start()
+        timeout = self.timeout_for(model)
+        if not ready.wait(timeout):
+            raise TimeoutError(f"No response from {model} within {timeout}s")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router():
+    """Return the process-wide ModelRouter."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
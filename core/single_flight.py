@@ -0,0 +1,165 @@
+import threading
+
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def _shared_error(error):
+    """Return the error to raise in callers that did not run the call.
+
+    Exceptions are shared as is. Interrupts such as KeyboardInterrupt or a
+    Streamlit rerun belong to the leader's thread, so waiters get a
+    RuntimeError instead.
+    """
+    if isinstance(error, Exception):
+        return error
+    return RuntimeError(f"In-flight request was interrupted: {type(error).__name__}")
+
+
+class _Call:
+    """An in-flight call whose result is shared by all waiters."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _StreamFanout:
+    """Buffers an upstream stream so every subscriber sees every chunk."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.chunks = []
+        self.finished = False
+        self.error = None
+        self.empty = False
+        self._cond = threading.Condition()
+
+    def pump(self, upstream, on_done):
+        try:
+            for chunk in upstream:
+                with self._cond:
+                    self.chunks.append(chunk)
+                    self._cond.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self.finished = True
+                self._cond.notify_all()
+            on_done()
+
+    def subscribe(self):
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.chunks) and not self.finished:
+                    self._cond.wait()
+                if index >= len(self.chunks):
+                    if self.error is not None:
+                        raise _shared_error(self.error)
+                    return
+                chunk = self.chunks[index]
+            index += 1
+            yield chunk
+
+
+class SingleFlight:
+    """Coalesce concurrent identical requests into one upstream call.
+
+    Callers pass a request fingerprint as key. While a call for that key is
+    in flight, further callers wait for it instead of issuing their own and
+    receive the same result, error or stream. Nothing is cached once the
+    call has finished.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._streams = {}
+
+    def do(self, key, fn):
+        """Run `fn()` once for all concurrent callers with the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                if not isinstance(e, Exception):
+                    raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            logger.info("Joined in-flight request", extra={"flight_key": key})
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error if leader else _shared_error(call.error)
+        return call.result
+
+    def stream(self, key, fn):
+        """Share the stream returned by `fn()` among concurrent callers.
+
+        Each caller gets its own iterator that replays all chunks from the
+        start. Returns None if `fn()` returned None; if `fn()` raised, every
+        caller gets the error.
+        """
+        with self._lock:
+            fanout = self._streams.get(key)
+            leader = fanout is None
+            if leader:
+                fanout = self._streams[key] = _StreamFanout()
+
+        if leader:
+            upstream = None
+            try:
+                upstream = fn()
+                if upstream is not None:
+                    threading.Thread(
+                        target=fanout.pump,
+                        args=(upstream, lambda: self._forget(key)),
+                        daemon=True,
+                    ).start()
+            except BaseException as e:
+                upstream = None
+                fanout.error = e
+                raise
+            finally:
+                # Waiters must never be left blocked, whatever interrupted us
+                if upstream is None:
+                    self._forget(key)
+                    fanout.empty = True
+                fanout.started.set()
+            if upstream is None:
+                return None
+        else:
+            logger.info("Joined in-flight stream", extra={"flight_key": key})
+            fanout.started.wait()
+            if fanout.empty:
+                if fanout.error is not None:
+                    raise _shared_error(fanout.error)
+                return None
+
+        return fanout.subscribe()
+
+    def _forget(self, key):
+        with self._lock:
+            self._streams.pop(key, None)
+
+
+_flight = SingleFlight()
+
+
+def get_single_flight():
+    """Return the process-wide SingleFlight."""
+    return _flight
@@ -1,17 +1,14 @@
 import streamlit as st
 import google.generativeai as genai
-import logging
 from dotenv import load_dotenv
 import os
+from core.logging_config import get_logger
+from core.agents import MAX_QUERY_LENGTH, chat_response
+from core.chat_history import ChatHistory
+from core.history_view import format_message, render_history
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='app.log',  # Log to a file
-    filemode='a'  # Append mode
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -25,8 +22,10 @@ if not api_key:
         st.stop()
 genai.configure(api_key=api_key)
 
-# Maximum chat history length
+# Maximum chat history length (in-session history only)
 MAX_HISTORY_LENGTH = 20
+# Number of messages shown initially and loaded per "load more" click
+HISTORY_PAGE_SIZE = 10
 
 class GeminiChatbot:
     def __init__(self):
@@ -36,10 +35,7 @@ class GeminiChatbot:
     def initialize_chat(self):
         """Initialize the chat session and state."""
         try:
-            self.model = genai.GenerativeModel(model_name="gemini-pro")
-            self.chat = self.model.start_chat(history=[])
-            if "gemini_chat_history" not in st.session_state:
-                st.session_state["gemini_chat_history"] = []
+            self.history = ChatHistory("gemini_chat_history", MAX_HISTORY_LENGTH)
         except Exception as e:
             logger.error(f"Error initializing chat: {e}")
             st.error("Failed to start chat session.")
@@ -53,12 +49,26 @@ class GeminiChatbot:
             Your conversation history is preserved during the session.
         """)
         # Inform users about chat history
-        st.info("""
-            **Note:** This is a demo chat app using the Gemini API.  
-            - Your chat history will last only during this session.  
-            - We do not save your chat history permanently.  
-            - The chat history is limited to the last 20 messages to ensure smooth performance.
-        """)
+        if self.history.restore_from_url:
+            st.info("""
+                **Note:** This is a demo chat app using the Gemini API.  
+                - Your chat history is saved and restored from this page's link.  
+                - Only the most recent messages are shown to ensure smooth performance.
+            """)
+            st.warning("Anyone you share this page's link with can read and continue this conversation.")
+        elif self.history.store is not None:
+            st.info("""
+                **Note:** This is a demo chat app using the Gemini API.  
+                - Your chat history is saved while this browser session is open.  
+                - Only the most recent messages are shown to ensure smooth performance.
+            """)
+        else:
+            st.info("""
+                **Note:** This is a demo chat app using the Gemini API.  
+                - Your chat history will last only during this session.  
+                - We do not save your chat history permanently.  
+                - The chat history is limited to the last 20 messages to ensure smooth performance.
+            """)
         # Sidebar information
         with st.sidebar:
             st.header("How It Works")
@@ -72,7 +82,7 @@ class GeminiChatbot:
     def get_gemini_response(self, query):
         """Get streaming response from Gemini API."""
         try:
-            return self.chat.send_message(query, stream=True)
+            return chat_response(query)
         except Exception as e:
             logger.error(f"Error fetching response from Gemini API: {e}")
             st.error(f"Failed to fetch response: {str(e)}")
@@ -83,12 +93,8 @@ class GeminiChatbot:
         st.divider()
         st.subheader("Conversation History")
 
-        # Display chat history in order (newest at the bottom)
-        for role, message in st.session_state["gemini_chat_history"]:
-            message_container = st.chat_message("user" if role == "user" else "assistant")
-            message_container.markdown(
-                f"**{'You' if role == 'user' else 'Gemini'}:** {message}"
-            )
+        # Display the most recent messages in order (newest at the bottom)
+        render_history(self.history, HISTORY_PAGE_SIZE, "Gemini")
 
     def handle_user_input(self):
         """Handle user input and generate responses."""
@@ -102,15 +108,12 @@ class GeminiChatbot:
 
         # If the user presses Enter or clicks a button
         if user_input and user_input.strip():
-            if len(user_input.strip()) > 1000:
+            if len(user_input.strip()) > MAX_QUERY_LENGTH:
                 st.warning("Query is too long. Please keep it under 1000 characters.")
             else:
                 # Add user query to chat history
-                st.session_state["gemini_chat_history"].append(("user", user_input))
-                # Trim history if it exceeds the maximum length
-                if len(st.session_state["gemini_chat_history"]) > MAX_HISTORY_LENGTH:
-                    st.session_state["gemini_chat_history"] = st.session_state["gemini_chat_history"][-MAX_HISTORY_LENGTH:]
-                st.chat_message("user").markdown(f"**You:** {user_input}")
+                self.history.append("user", user_input)
+                st.chat_message("user").markdown(format_message("You", user_input))
 
                 # Generate and display Gemini response
                 with st.chat_message("assistant"):
@@ -124,7 +127,7 @@ class GeminiChatbot:
                             for chunk in response_stream:
                                 bot_response += chunk.text
                                 placeholder.markdown(f"**Gemini:** {bot_response}")
-                            st.session_state["gemini_chat_history"].append(("bot", bot_response))
+                            self.history.append("bot", bot_response)
                         except Exception as e:
                             logger.error(f"Error processing streaming response: {e}")
                             st.error("An error occurred while processing the response.")
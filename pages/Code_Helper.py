@@ -1,17 +1,14 @@
 import streamlit as st
 import google.generativeai as genai
-import logging
 from dotenv import load_dotenv
 import os
+from core.logging_config import get_logger
+from core.chat_history import ChatHistory
+from core.history_view import render_history
+from core.agents import TASK_PROMPTS, analyze_code
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='app.log',  # Log to a file
-    filemode='a'  # Append mode
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -25,20 +22,19 @@ if not api_key:
         st.stop()
 genai.configure(api_key=api_key)
 
-# Maximum chat history length
+# Maximum chat history length (in-session history only)
 MAX_HISTORY_LENGTH = 20
+# Number of messages shown initially and loaded per "load more" click
+HISTORY_PAGE_SIZE = 10
 
 class CodeHelper:
     def __init__(self):
-        self.model = genai.GenerativeModel(model_name="gemini-pro")
-        self.chat = self.model.start_chat(history=[])
         self.initialize_session_state()
         self.setup_ui()
 
     def initialize_session_state(self):
         """Initialize session state for chat history."""
-        if "code_helper_chat_history" not in st.session_state:
-            st.session_state["code_helper_chat_history"] = []
+        self.history = ChatHistory("code_helper_chat_history", MAX_HISTORY_LENGTH)
 
     def setup_ui(self):
         """Set up the Streamlit UI."""
@@ -48,12 +44,26 @@ class CodeHelper:
             Paste your code snippet below, and our advanced AI will help you understand, debug, or optimize it.
         """)
         # Inform users about chat history
-        st.info("""
-            **Note:** This is a demo app using the Gemini API.  
-            - Your chat history will last only during this session.  
-            - We do not save your chat history permanently.  
-            - The chat history is limited to the last 20 messages to ensure smooth performance.
-        """)
+        if self.history.restore_from_url:
+            st.info("""
+                **Note:** This is a demo app using the Gemini API.  
+                - Your chat history is saved and restored from this page's link.  
+                - Only the most recent messages are shown to ensure smooth performance.
+            """)
+            st.warning("Anyone you share this page's link with can read and continue this conversation.")
+        elif self.history.store is not None:
+            st.info("""
+                **Note:** This is a demo app using the Gemini API.  
+                - Your chat history is saved while this browser session is open.  
+                - Only the most recent messages are shown to ensure smooth performance.
+            """)
+        else:
+            st.info("""
+                **Note:** This is a demo app using the Gemini API.  
+                - Your chat history will last only during this session.  
+                - We do not save your chat history permanently.  
+                - The chat history is limited to the last 20 messages to ensure smooth performance.
+            """)
         # Sidebar information
         with st.sidebar:
             st.header("How It Works")
@@ -64,10 +74,10 @@ class CodeHelper:
             """)
             st.info("💻 Best results with clear, concise code snippets")
 
-    def get_gemini_response(self, query):
+    def get_gemini_response(self, task, code_snippet):
         """Get streaming response from Gemini API."""
         try:
-            return self.chat.send_message(query, stream=True)
+            return analyze_code(task, code_snippet)
         except Exception as e:
             logger.error(f"Error fetching response from Gemini API: {e}")
             st.error(f"Failed to fetch response: {str(e)}")
@@ -83,7 +93,7 @@ class CodeHelper:
 
         task = st.radio(
             "What would you like the AI to do?",
-            options=["Explain the Code", "Debug the Code", "Optimize the Code"],
+            options=list(TASK_PROMPTS),
             horizontal=True
         )
 
@@ -102,37 +112,29 @@ class CodeHelper:
     def process_code(self, code_snippet, task):
         """Process the code snippet and generate a response."""
         user_task = f"Task: {task}\nCode:\n{code_snippet}"
-        st.session_state["code_helper_chat_history"].append(("user", user_task))
-        # Trim history if it exceeds the maximum length
-        if len(st.session_state["code_helper_chat_history"]) > MAX_HISTORY_LENGTH:
-            st.session_state["code_helper_chat_history"] = st.session_state["code_helper_chat_history"][-MAX_HISTORY_LENGTH:]
+        self.history.append("user", user_task)
         
         with st.spinner(f"{task}ing your code..."):
-            prompt = self.create_analysis_prompt(task, code_snippet)
-            response_stream = self.get_gemini_response(prompt)
+            response_stream = self.get_gemini_response(task, code_snippet)
             
             if response_stream:
                 response = self.display_streaming_response(response_stream)
-                st.session_state["code_helper_chat_history"].append(("bot", response))
-
-    @staticmethod
-    def create_analysis_prompt(task, code):
-        """Create a prompt for the Gemini API based on the task."""
-        task_prompts = {
-            "Explain the Code": "Explain this code in detail, including its purpose, functionality, and key concepts:",
-            "Debug the Code": "Analyze this code for potential issues and provide debugging suggestions:",
-            "Optimize the Code": "Suggest optimizations for this code, explaining the improvements:"
-        }
-        return f"{task_prompts[task]}\n\n{code}"
+                if response is not None:
+                    self.history.append("bot", response)
 
     def display_streaming_response(self, stream):
-        """Display the streaming response from Gemini."""
+        """Display the streaming response from Gemini; None if it failed."""
         response_container = st.empty()
         full_response = ""
         
-        for chunk in stream:
-            full_response += chunk.text
-            response_container.markdown(f"**CodeHelper:** ```python\n{full_response}\n```")
+        try:
+            for chunk in stream:
+                full_response += chunk.text
+                response_container.markdown(f"**CodeHelper:** ```python\n{full_response}\n```")
+        except Exception as e:
+            logger.error(f"Error processing streaming response: {e}")
+            st.error("An error occurred while processing the response.")
+            return None
         
         return full_response
 
@@ -141,9 +143,7 @@ class CodeHelper:
         st.divider()
         st.subheader("Analysis History")
         
-        for role, message in st.session_state["code_helper_chat_history"]:
-            message_container = st.chat_message("user" if role == "user" else "assistant")
-            message_container.markdown(f"**{'You' if role == 'user' else 'CodeHelper'}:** ```python\n{message}\n```")
+        render_history(self.history, HISTORY_PAGE_SIZE, "CodeHelper", code_block=True)
 
 def main():
     """Main application entry point."""
@@ -2,17 +2,12 @@ import streamlit as st
 from PIL import Image
 import google.generativeai as genai
 import os
+from core.logging_config import get_logger
+from core.agents import FOOD_MAX_FILE_SIZE, FOOD_PROMPT, analyze_food
 from dotenv import load_dotenv
-import logging
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='app.log',  # Log to a file
-    filemode='a'  # Append mode
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -21,7 +16,7 @@ load_dotenv()
 genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
 
 # Maximum file size allowed (10 MB)
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB in bytes
+MAX_FILE_SIZE = FOOD_MAX_FILE_SIZE  # 10 MB in bytes
 
 class FoodAnalyzer:
     def __init__(self):
@@ -32,16 +27,7 @@ class FoodAnalyzer:
             layout="wide"
         )
         # Define the input prompt for the Gemini API
-        self.input_prompt = """
-        You are an expert nutritionist and food analyst. Carefully examine the food image and provide:
-        1. Detailed list of food items identified
-        2. Calories for each item
-        3. Nutritional breakdown (protein, carbs, fats)
-        4. Estimated total calorie count
-        5. Brief health insights or recommendations
-
-        Format your response clearly with headings and bullet points.
-        """
+        self.input_prompt = FOOD_PROMPT
 
     @staticmethod
     def process_uploaded_image(uploaded_file):
@@ -64,9 +50,7 @@ class FoodAnalyzer:
     @staticmethod
     def get_gemini_response(image_data, prompt):
         """Send image and prompt to the Gemini API and return the response."""
-        model = genai.GenerativeModel(model_name="gemini-1.5-flash-8b")
-        response = model.generate_content([image_data[0], prompt])
-        return response.text
+        return analyze_food(image_data[0], prompt)
 
     def render(self):
         # Title and description
@@ -1,19 +1,20 @@
 import streamlit as st
-from phi.agent import Agent
-from phi.model.google import Gemini
-from phi.tools.duckduckgo import DuckDuckGo
 import google.generativeai as genai
-import time
-from pathlib import Path
-import tempfile
 from dotenv import load_dotenv
 import os
-import logging
+from core.logging_config import get_logger
+from core.context_cache import fingerprint
+from core.agents import (
+    VIDEO_EXTENSIONS,
+    VIDEO_MAX_FILE_SIZE,
+    get_video_upload,
+    summarize_video,
+    upload_video_bytes,
+)
 from datetime import datetime
 
 # Initialize logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 class VideoSummarizerApp:
     def __init__(self):
@@ -31,8 +32,8 @@ class VideoSummarizerApp:
         
     def setup_constants(self):
         """Set up application constants"""
-        self.MAX_FILE_SIZE = 200 * 1024 * 1024  # 200MB
-        self.ALLOWED_EXTENSIONS = ['mp4', 'mov', 'avi']
+        self.MAX_FILE_SIZE = VIDEO_MAX_FILE_SIZE  # 200MB
+        self.ALLOWED_EXTENSIONS = VIDEO_EXTENSIONS
         
     def setup_ui(self):
         """Configure the user interface"""
@@ -81,17 +82,6 @@ class VideoSummarizerApp:
             """)
             st.info("📹 Best results with clear, well-encoded video files")
 
-    @staticmethod
-    @st.cache_resource
-    def initialize_agent():
-        """Initialize the AI agent with caching"""
-        return Agent(
-            name="Video AI Summarizer",
-            model=Gemini(id="gemini-2.0-flash-exp"),
-            tools=[DuckDuckGo()],
-            markdown=True,
-        )
-
     def validate_video(self, video_file):
         """Validate the uploaded video file"""
         if video_file.size > self.MAX_FILE_SIZE:
@@ -109,54 +99,31 @@ class VideoSummarizerApp:
         status_text = st.empty()
         
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as temp_video:
-                temp_video.write(video_file.read())
-                video_path = temp_video.name
-
-            # Update progress
+            # Upload and process the video (reused for follow-up questions)
             progress_bar.progress(0.2)
-            status_text.text("Uploading video...")
-            processed_video = genai.upload_file(video_path)
-
-            # Process video
-            progress_bar.progress(0.4)
-            status_text.text("Processing video...")
-            while processed_video.state.name == "PROCESSING":
-                time.sleep(1)
-                processed_video = genai.get_file(processed_video.name)
+            status_text.text("Uploading and processing video...")
+            video_bytes = video_file.getvalue()
+            extension = video_file.name.split('.')[-1].lower()
+            video_key = fingerprint(video_bytes)
+            processed_video = get_video_upload(
+                video_key, lambda: upload_video_bytes(video_bytes, extension)
+            )
 
             # Generate analysis
             progress_bar.progress(0.7)
             status_text.text("Analyzing content...")
-            
-            analysis_prompt = f"""
-            Analyze the uploaded video for content and context.
-            Query: {query}
-            
-            Provide a detailed response with:
-            1. Main points and key moments
-            2. Relevant timestamps
-            3. Context and insights
-            4. Summary and recommendations
-            """
 
-            agent = self.initialize_agent()
-            response = agent.run(analysis_prompt, videos=[processed_video])
+            analysis = summarize_video(processed_video, query, video_key)
 
             # Complete analysis
             progress_bar.progress(1.0)
             status_text.text("Analysis complete!")
             
-            return response.content
+            return analysis
 
         except Exception as e:
             logger.error(f"Error during video processing: {e}")
             return f"Error analyzing video: {str(e)}"
-        finally:
-            # Cleanup
-            if 'video_path' in locals():
-                Path(video_path).unlink(missing_ok=True)
 
     def run(self):
         """Main application loop"""
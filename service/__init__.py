@@ -0,0 +1 @@
+"""Headless access to the AI agents: HTTP API and batch CLI."""
@@ -0,0 +1,164 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import List, Tuple
+
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from core.agents import (
+    FOOD_MAX_FILE_SIZE,
+    FOOD_MIME_TYPES,
+    MAX_QUERY_LENGTH,
+    TASK_PROMPTS,
+    VIDEO_EXTENSIONS,
+    VIDEO_MAX_FILE_SIZE,
+    analyze_code,
+    analyze_food,
+    chat_response,
+    configure_gemini,
+    summarize_video_bytes,
+)
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Maximum number of Gemini requests served at the same time
+MAX_CONCURRENCY = int(os.getenv("SERVICE_MAX_CONCURRENCY", 8))
+
+configure_gemini()
+app = FastAPI(title="AI Agents Hub API")
+_limit = asyncio.Semaphore(MAX_CONCURRENCY)
+
+
+class ChatRequest(BaseModel):
+    query: str
+    history: List[Tuple[str, str]] = []
+
+
+class CodeRequest(BaseModel):
+    task: str
+    code: str
+
+
+async def _run_limited(fn, *args):
+    """Run a blocking agent call in the threadpool under the concurrency limit."""
+    async with _limit:
+        try:
+            return await run_in_threadpool(fn, *args)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error fetching response from Gemini API: {e}")
+            raise HTTPException(status_code=502, detail=f"Failed to fetch response: {e}")
+
+
+async def _stream_limited(fn, *args):
+    """Start a streaming agent call and relay its text chunks to the client.
+
+    The concurrency slot is held until the stream is exhausted. It is
+    released exactly once, whether the stream finishes, fails, or the
+    client disconnects before the body starts.
+    """
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            _limit.release()
+
+    await _limit.acquire()
+    try:
+        stream = await run_in_threadpool(fn, *args)
+    except ValueError as e:
+        release()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        release()
+        logger.error(f"Error fetching response from Gemini API: {e}")
+        raise HTTPException(status_code=502, detail=f"Failed to fetch response: {e}")
+    except BaseException:
+        # Request cancelled while the first chunk was being fetched
+        release()
+        raise
+
+    async def body():
+        try:
+            async for chunk in iterate_in_threadpool(iter(stream or ())):
+                yield chunk.text
+        except Exception as e:
+            logger.error(f"Error processing streaming response: {e}")
+        finally:
+            release()
+
+    # The background task covers responses whose body never starts
+    return StreamingResponse(
+        body(),
+        media_type="text/plain; charset=utf-8",
+        background=BackgroundTask(release),
+    )
+
+
+def _validate_query(query):
+    if not query.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty.")
+    if len(query) > MAX_QUERY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Query must be under {MAX_QUERY_LENGTH} characters.")
+
+
+async def _read_upload(upload, max_size):
+    data = await upload.read()
+    if len(data) > max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File size exceeds the limit of {max_size / (1024 * 1024):.0f} MB",
+        )
+    return data
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/food")
+async def food(image: UploadFile = File(...)):
+    """Analyze a food image and return nutritional insights."""
+    if image.content_type not in FOOD_MIME_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid image type. Allowed: {', '.join(FOOD_MIME_TYPES)}")
+    data = await _read_upload(image, FOOD_MAX_FILE_SIZE)
+    analysis = await _run_limited(analyze_food, {"mime_type": image.content_type, "data": data})
+    return {"analysis": analysis}
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    """Stream the assistant's reply to a query."""
+    _validate_query(request.query)
+    return await _stream_limited(chat_response, request.query, request.history)
+
+
+@app.post("/code")
+async def code(request: CodeRequest):
+    """Stream an explanation, debugging help or optimizations for a snippet."""
+    if request.task not in TASK_PROMPTS:
+        raise HTTPException(status_code=400, detail=f"Invalid task. Allowed: {', '.join(TASK_PROMPTS)}")
+    if not request.code.strip():
+        raise HTTPException(status_code=400, detail="Code must not be empty.")
+    return await _stream_limited(analyze_code, request.task, request.code)
+
+
+@app.post("/video")
+async def video(video: UploadFile = File(...), query: str = Form(...)):
+    """Upload a video and answer a query about it."""
+    _validate_query(query)
+    extension = Path(video.filename or "").suffix.lstrip(".").lower()
+    if extension not in VIDEO_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid file format. Allowed: {', '.join(VIDEO_EXTENSIONS)}")
+    data = await _read_upload(video, VIDEO_MAX_FILE_SIZE)
+    analysis = await _run_limited(summarize_video_bytes, data, extension, query)
+    return {"analysis": analysis}
@@ -0,0 +1,150 @@
+"""Run the agents over many inputs without a browser.
+
+Examples:
+    python -m service.batch food ./meals -o food.jsonl
+    python -m service.batch code snippets.jsonl -o code.jsonl
+    python -m service.batch chat queries.jsonl
+    python -m service.batch video ./videos --query "Summarize the main points"
+
+Results are written as JSON lines, one per input, in completion order.
+"""
+import argparse
+import json
+import mimetypes
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from core.agents import (
+    FOOD_MAX_FILE_SIZE,
+    VIDEO_EXTENSIONS,
+    VIDEO_MAX_FILE_SIZE,
+    analyze_code,
+    analyze_food,
+    chat_response,
+    configure_gemini,
+    summarize_video_file,
+)
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png']
+
+
+def _collect_text(stream):
+    return "".join(chunk.text for chunk in stream) if stream else ""
+
+
+def _files(directory, extensions):
+    return sorted(
+        path for path in Path(directory).iterdir()
+        if path.is_file() and path.suffix.lstrip(".").lower() in extensions
+    )
+
+
+def _jsonl_jobs(path, handle):
+    """Yield one job per JSONL line; malformed lines become failing jobs."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                if not isinstance(item, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                def job(error=f"Invalid JSON on line {line_number}: {e}"):
+                    raise ValueError(error)
+                yield line_number, job
+                continue
+            def job(item=item):
+                return handle(item)
+            yield item.get("id", line_number), job
+
+
+def food_jobs(args):
+    for path in _files(args.input, IMAGE_EXTENSIONS):
+        def job(path=path):
+            if path.stat().st_size > FOOD_MAX_FILE_SIZE:
+                raise ValueError("File size exceeds the limit of 10 MB")
+            image_part = {"mime_type": mimetypes.guess_type(path.name)[0], "data": path.read_bytes()}
+            return {"analysis": analyze_food(image_part)}
+        yield str(path), job
+
+
+def code_jobs(args):
+    def handle(item):
+        return {"task": item["task"], "analysis": _collect_text(analyze_code(item["task"], item["code"]))}
+    return _jsonl_jobs(args.input, handle)
+
+
+def chat_jobs(args):
+    def handle(item):
+        stream = chat_response(item["query"], item.get("history", ()))
+        return {"response": _collect_text(stream)}
+    return _jsonl_jobs(args.input, handle)
+
+
+def video_jobs(args):
+    for path in _files(args.input, VIDEO_EXTENSIONS):
+        def job(path=path):
+            if path.stat().st_size > VIDEO_MAX_FILE_SIZE:
+                raise ValueError("File size exceeds the limit of 200 MB")
+            return {"analysis": summarize_video_file(path, args.query)}
+        yield str(path), job
+
+
+JOBS = {
+    "food": (food_jobs, "directory of food images"),
+    "code": (code_jobs, "JSONL file of {\"task\", \"code\"} objects"),
+    "chat": (chat_jobs, "JSONL file of {\"query\"} objects"),
+    "video": (video_jobs, "directory of videos"),
+}
+
+
+def run(jobs, workers, out):
+    """Run jobs on a thread pool and write one JSON line per result."""
+    succeeded = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(job): item_id for item_id, job in jobs}
+        for future in as_completed(futures):
+            item_id = futures[future]
+            try:
+                record = {"id": item_id, **future.result()}
+                succeeded += 1
+            except Exception as e:
+                logger.error(f"Batch item {item_id} failed: {e}")
+                record = {"id": item_id, "error": str(e)}
+                failed += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    return succeeded, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the AI agents in batch mode.")
+    subparsers = parser.add_subparsers(dest="agent", required=True)
+    for name, (_, input_help) in JOBS.items():
+        sub = subparsers.add_parser(name)
+        sub.add_argument("input", help=input_help)
+        sub.add_argument("-o", "--output", help="output JSONL file (default: stdout)")
+        sub.add_argument("-w", "--workers", type=int, default=4, help="concurrent requests (default: 4)")
+        if name == "video":
+            sub.add_argument("--query", required=True, help="question asked about every video")
+    args = parser.parse_args(argv)
+
+    configure_gemini()
+    jobs = JOBS[args.agent][0](args)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        succeeded, failed = run(jobs, args.workers, out)
+    finally:
+        if args.output:
+            out.close()
+    print(f"{succeeded} succeeded, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())